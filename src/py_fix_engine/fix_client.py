@@ -5,11 +5,13 @@ from py_fix_engine.fix_session import FixSession
 from py_fix_engine.fix_message import FixMessage
 
 class FixClient: 
-    def __init__(self, host, port, sender_id="MY_CLIENT", target_id="SERVER"): 
+    def __init__(self, host, port, sender_id="MY_CLIENT", target_id="SERVER", **session_options): 
         self.host = host 
         self.port = port 
         self.sender_id = sender_id
         self.target_id = target_id
+        # Passed to every FixSession (e.g. high_watermark, outbound_policy)
+        self.session_options = session_options
         
         self.session = None
         self.is_connected = False
@@ -35,7 +37,7 @@ class FixClient:
             sock.connect((self.host, self.port))
             
             # Hand the socket over to the Session
-            self.session = FixSession(sock, self.sender_id, self.target_id)
+            self.session = FixSession(sock, self.sender_id, self.target_id, **self.session_options)
             self.session.start()
             
             print(f"Socket Connected. Starting Session.")
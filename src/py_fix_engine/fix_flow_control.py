@@ -0,0 +1,179 @@
+"""
+Flow control for FIX sessions.
+
+Responsibility: Bound the memory a session can use for queued messages
+and decide what happens when a counterparty cannot keep up.
+
+Design: `BoundedQueue` is a FIFO with a high and a low watermark.
+Reaching the high watermark applies the queue's `FlowPolicy`:
+- BLOCK:      producers wait until the queue drains to the low watermark.
+              A producer that must not wait can put(block=False) to be
+              admitted past the high watermark, up to the hard limit, and
+              call wait_for_room() later.
+- DROP:       the new item is discarded and an alert is printed
+- DISCONNECT: the item is refused; the owning session drops the connection
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class FlowPolicy:
+    BLOCK      = "block"
+    DROP       = "drop"
+    DISCONNECT = "disconnect"
+
+
+class BoundedQueue:
+    def __init__(self, name, high_watermark=10000, low_watermark=None, policy=FlowPolicy.BLOCK,
+                 hard_limit=None):
+        """
+        Args:
+            name: Label used in alerts and metrics (e.g. "SERVER->CLIENT outbound").
+            high_watermark: Depth at which the policy kicks in. Only put(block=False) exceeds it.
+            low_watermark: Depth at which blocked producers resume. Defaults to half of high.
+            policy: One of FlowPolicy.BLOCK, FlowPolicy.DROP, FlowPolicy.DISCONNECT.
+            hard_limit: Depth that not even put(block=False) may exceed. Defaults to 4x high.
+        """
+        if low_watermark is None:
+            low_watermark = high_watermark // 2
+        if hard_limit is None:
+            hard_limit = 4 * high_watermark
+        if not 0 <= low_watermark < high_watermark:
+            raise ValueError("low_watermark must be >= 0 and below high_watermark")
+        if hard_limit < high_watermark:
+            raise ValueError("hard_limit must not be below high_watermark")
+
+        self.name = name
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.hard_limit = hard_limit
+        self.policy = policy
+
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        # Set on reaching the high watermark, cleared at the low watermark
+        self._saturated = False
+
+        self.max_depth = 0
+        self.enqueued = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.blocked_time = 0.0
+        self.overshoot = 0
+        self.refused = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item, block=True):
+        """Append an item. Returns False if it was not queued (dropped, refused or closed).
+
+        With block=False a BLOCK-policy queue admits the item above the high
+        watermark instead of waiting (counted in `overshoot`), but refuses it
+        at the hard limit (counted in `refused`).
+        """
+        with self._cond:
+            if self._closed:
+                return False
+
+            if self._saturated or len(self._items) >= self.high_watermark:
+                if not self._saturated:
+                    self._saturated = True
+                    print(f"!!! FLOW: {self.name} queue hit high watermark ({self.high_watermark}), policy={self.policy}")
+
+                if self.policy == FlowPolicy.DROP:
+                    self.dropped += 1
+                    return False
+                if self.policy == FlowPolicy.DISCONNECT:
+                    return False
+
+                if block:
+                    self._wait_while_saturated()
+                    if self._closed:
+                        return False
+                elif len(self._items) >= self.hard_limit:
+                    self.refused += 1
+                    return False
+                else:
+                    self.overshoot += 1
+
+            self._items.append(item)
+            self.enqueued += 1
+            if len(self._items) > self.max_depth:
+                self.max_depth = len(self._items)
+            self._cond.notify_all()
+            return True
+
+    def _wait_while_saturated(self, timeout=None):
+        # Caller holds self._cond
+        self.blocked += 1
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        while self._saturated and not self._closed:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            self._cond.wait(remaining)
+        self.blocked_time += time.monotonic() - start
+
+    def wait_for_room(self, timeout=None):
+        """Block while the queue is above its high watermark and has not yet drained to the low one.
+
+        Returns False if it is still saturated after `timeout` seconds.
+        """
+        with self._cond:
+            if self._saturated and not self._closed:
+                self._wait_while_saturated(timeout)
+            return not self._saturated
+
+    def get(self, timeout=None):
+        """Remove and return the oldest item, or None on timeout or once closed and empty."""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._on_removed()
+            return item
+
+    def get_nowait(self):
+        """Remove and return the oldest item, or None if empty."""
+        with self._cond:
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._on_removed()
+            return item
+
+    def _on_removed(self):
+        if self._saturated and len(self._items) <= self.low_watermark:
+            self._saturated = False
+            print(f"FLOW: {self.name} queue drained to low watermark ({self.low_watermark}), resuming")
+            self._cond.notify_all()
+
+    def close(self):
+        """Wake every waiting producer and consumer; further puts are refused."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def metrics(self):
+        return {
+            "depth": len(self._items),
+            "max_depth": self.max_depth,
+            "high_watermark": self.high_watermark,
+            "low_watermark": self.low_watermark,
+            "hard_limit": self.hard_limit,
+            "policy": self.policy,
+            "saturated": self._saturated,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "blocked": self.blocked,
+            "blocked_time_s": self.blocked_time,
+            "overshoot": self.overshoot,
+            "refused": self.refused,
+        }
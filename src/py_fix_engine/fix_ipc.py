@@ -0,0 +1,291 @@
+"""
+Shared-memory IPC bridge between the engine and strategy processes.
+
+Responsibility: Move raw FIX strings between a FixSession living in the
+engine process and strategy code living in other Python processes,
+without sockets and without pickling.
+
+Design: Two single-producer/single-consumer ring buffers per bridge, each
+backed by `multiprocessing.shared_memory`:
+- `<name>_in`  : engine -> strategy (parsed inbound application messages)
+- `<name>_out` : strategy -> engine (outbound order requests)
+
+Records are length-prefixed bytes. The read/write cursors are
+monotonically increasing byte counters stored in the segment header, so
+each side only ever writes its own cursor. The header also records the
+capacity, since an attached mapping may be rounded up to the page size.
+"""
+
+import struct
+import threading
+import time
+from multiprocessing import Process, parent_process, resource_tracker, shared_memory
+
+from py_fix_engine.fix_message import FixMessage
+from py_fix_engine.fix_parser import parse
+
+# Header layout: head (bytes written), tail (bytes read) and data capacity, all uint64
+_HEAD_OFFSET = 0
+_TAIL_OFFSET = 8
+_CAPACITY_OFFSET = 16
+_HEADER_SIZE = 24
+
+_LEN = struct.Struct("<I")
+_CURSOR = struct.Struct("<Q")
+
+# Length value telling the reader to skip to the start of the buffer
+_WRAP_MARKER = 0xFFFFFFFF
+
+# Tags the session stamps on every outbound message
+_SESSION_TAGS = {8, 9, 10, 34, 35, 49, 52, 56}
+
+
+class ShmRingBuffer:
+    def __init__(self, name=None, capacity=1 << 20, create=True):
+        """Create or attach to a shared-memory ring buffer.
+
+        Args:
+            name: Shared memory segment name. Required when attaching.
+            capacity: Size of the data region in bytes (ignored on attach).
+            create: True for the owning side, False to attach to an existing one.
+        """
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=_HEADER_SIZE + capacity)
+            self._shm.buf[:_HEADER_SIZE] = bytes(_HEADER_SIZE)
+            _CURSOR.pack_into(self._shm.buf, _CAPACITY_OFFSET, capacity)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            # An unrelated process has its own resource tracker, which would
+            # unlink the segment when that process exits. Children started via
+            # multiprocessing share the creator's tracker and are left alone.
+            if parent_process() is None:
+                try:
+                    resource_tracker.unregister(self._shm._name, "shared_memory")
+                except Exception:
+                    pass
+        self.name = self._shm.name
+        self.is_owner = create
+        self._buf = self._shm.buf
+        # Both sides must wrap at the same offset, whatever size the mapping was rounded to
+        self.capacity = _CURSOR.unpack_from(self._buf, _CAPACITY_OFFSET)[0]
+
+    def _head(self):
+        return _CURSOR.unpack_from(self._buf, _HEAD_OFFSET)[0]
+
+    def _tail(self):
+        return _CURSOR.unpack_from(self._buf, _TAIL_OFFSET)[0]
+
+    def depth(self):
+        """Return the number of bytes currently waiting to be read."""
+        return self._head() - self._tail()
+
+    def push(self, data: bytes) -> bool:
+        """Append one record. Returns False if the buffer is full.
+
+        Records are limited to half the capacity: a record that does not fit
+        before the end of the buffer skips the remainder, and with
+        skip + need <= capacity an empty ring always has room.
+
+        Producer side only.
+        """
+        need = _LEN.size + len(data)
+        if need > self.capacity // 2:
+            raise ValueError(f"Record of {len(data)} bytes exceeds half the ring capacity {self.capacity}")
+
+        head = self._head()
+        pos = head % self.capacity
+        contiguous = self.capacity - pos
+        skip = contiguous if contiguous < need else 0
+
+        if self.capacity - (head - self._tail()) < skip + need:
+            return False
+
+        if skip:
+            if contiguous >= _LEN.size:
+                _LEN.pack_into(self._buf, _HEADER_SIZE + pos, _WRAP_MARKER)
+            pos = 0
+
+        start = _HEADER_SIZE + pos
+        _LEN.pack_into(self._buf, start, len(data))
+        self._buf[start + _LEN.size:start + need] = data
+
+        # Publish only after the payload is in place
+        _CURSOR.pack_into(self._buf, _HEAD_OFFSET, head + skip + need)
+        return True
+
+    def pop(self):
+        """Remove and return the oldest record as bytes, or None if empty.
+
+        Consumer side only.
+        """
+        tail = self._tail()
+        if tail == self._head():
+            return None
+
+        pos = tail % self.capacity
+        contiguous = self.capacity - pos
+        if contiguous < _LEN.size or _LEN.unpack_from(self._buf, _HEADER_SIZE + pos)[0] == _WRAP_MARKER:
+            tail += contiguous
+            pos = 0
+
+        start = _HEADER_SIZE + pos
+        length = _LEN.unpack_from(self._buf, start)[0]
+        data = bytes(self._buf[start + _LEN.size:start + _LEN.size + length])
+
+        _CURSOR.pack_into(self._buf, _TAIL_OFFSET, tail + _LEN.size + length)
+        return data
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+        if self.is_owner:
+            try: self._shm.unlink()
+            except FileNotFoundError: pass
+
+
+def _to_fix_message(raw_str, sender_id, target_id):
+    """Rebuild a FixMessage from a raw FIX string written by a strategy.
+
+    Session tags (seq num, sending time, comp ids, checksum) are dropped
+    so that FixSession.send_message() can stamp its own.
+    """
+    parsed = parse(raw_str)
+    msg = FixMessage(msg_type=parsed["tags"][35], sender_id=sender_id, target_id=target_id)
+    for tag, value in parsed["tags"].items():
+        if tag not in _SESSION_TAGS:
+            msg.add_tag(tag, value)
+    for count_tag, entries in parsed["groups"].items():
+        msg.add_group(count_tag, entries)
+    return msg
+
+
+class FixIpcBridge:
+    def __init__(self, session, name, capacity=1 << 20, poll_interval=0.0001):
+        """Engine-side end of the bridge.
+
+        Args:
+            session: The FixSession to publish from and send through.
+            name: Prefix for the two shared memory segments.
+            capacity: Data region size of each ring buffer in bytes.
+            poll_interval: Sleep between polls of an empty outbound ring.
+        """
+        self.session = session
+        self.name = name
+        self.poll_interval = poll_interval
+        self.inbound = ShmRingBuffer(f"{name}_in", capacity, create=True)
+        self.outbound = ShmRingBuffer(f"{name}_out", capacity, create=True)
+        self.dropped = 0
+
+        self.is_running = False
+        self.outbound_thread = threading.Thread(target=self._outbound_loop, daemon=True)
+
+    def start(self):
+        self.is_running = True
+        self.session.on_app_message = self._publish
+        self.outbound_thread.start()
+
+    def _publish(self, msg_str):
+        """Called by the session's dispatcher thread for each application message."""
+        try:
+            published = self.inbound.push(msg_str.encode())
+            reason = "full"
+        except ValueError:
+            # Must not raise here: that would stop the whole FIX session
+            published = False
+            reason = "too small for message"
+        if not published:
+            self.dropped += 1
+            print(f"!!! IPC inbound ring {reason}, dropped message ({self.dropped} total)")
+
+    def _outbound_loop(self):
+        while self.is_running:
+            data = self.outbound.pop()
+            if data is None:
+                time.sleep(self.poll_interval)
+                continue
+            try:
+                msg = _to_fix_message(data.decode(), self.session.sender_id, self.session.target_id)
+                self.session.send_message(msg)
+            except Exception as e:
+                print(f"IPC outbound error: {e}")
+
+    def stop(self):
+        self.is_running = False
+        self.session.on_app_message = None
+        if self.outbound_thread.is_alive():
+            self.outbound_thread.join()
+        self.inbound.close()
+        self.outbound.close()
+
+
+class StrategyEndpoint:
+    def __init__(self, name):
+        """Strategy-side end of the bridge. Attaches to an existing FixIpcBridge."""
+        self.inbound = ShmRingBuffer(f"{name}_in", create=False)
+        self.outbound = ShmRingBuffer(f"{name}_out", create=False)
+
+    def recv(self):
+        """Return the next inbound raw FIX string, or None if nothing is waiting."""
+        data = self.inbound.pop()
+        return data.decode() if data is not None else None
+
+    def send(self, msg: FixMessage) -> bool:
+        """Queue an outbound message. Returns False if the ring is full.
+
+        Raises ValueError if the encoded message is larger than half the ring
+        capacity; it would never fit, so retrying is pointless.
+        """
+        return self.outbound.push(msg.encode().encode())
+
+    def close(self):
+        self.inbound.close()
+        self.outbound.close()
+
+
+def _echo_worker(request_name, reply_name, count):
+    requests = ShmRingBuffer(request_name, create=False)
+    replies = ShmRingBuffer(reply_name, create=False)
+    for _ in range(count):
+        data = requests.pop()
+        while data is None:
+            time.sleep(0)
+            data = requests.pop()
+        while not replies.push(data):
+            time.sleep(0)
+    requests.close()
+    replies.close()
+
+
+def run_loopback_benchmark(count=100000, payload_size=200, capacity=1 << 16):
+    """Measure round-trip latency through a pair of rings and an echo process.
+
+    Returns a dict of latency stats in microseconds.
+    """
+    requests = ShmRingBuffer(capacity=capacity)
+    replies = ShmRingBuffer(capacity=capacity)
+    worker = Process(target=_echo_worker, args=(requests.name, replies.name, count), daemon=True)
+    worker.start()
+
+    payload = b"x" * payload_size
+    samples = []
+    try:
+        for _ in range(count):
+            start = time.perf_counter_ns()
+            while not requests.push(payload):
+                time.sleep(0)
+            while replies.pop() is None:
+                time.sleep(0)
+            samples.append(time.perf_counter_ns() - start)
+        worker.join()
+    finally:
+        requests.close()
+        replies.close()
+
+    samples.sort()
+    return {
+        "count": count,
+        "min_us": samples[0] / 1000,
+        "p50_us": samples[len(samples) // 2] / 1000,
+        "p99_us": samples[int(len(samples) * 0.99)] / 1000,
+        "max_us": samples[-1] / 1000,
+    }
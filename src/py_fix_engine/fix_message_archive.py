@@ -0,0 +1,199 @@
+"""
+Compressed archival tier for end-of-day message stores.
+
+Responsibility: Keep every day's outbound messages for compliance while
+the live FixMessageStore starts fresh each day.
+
+Design: At rollover the live store is sealed into a segment of two files
+in `archive_dir`:
+- `messages_<id>_<day>_<n>.blocks`     : messages in blocks of `block_size`,
+                                          each block compressed on its own
+- `messages_<id>_<day>_<n>.index.json` : one entry per block with its byte
+                                          range and seq / SendingTime bounds
+
+The index is sparse (per block, not per message), so a lookup by sequence
+range or time window only decompresses the blocks that overlap it.
+The index is written last; a segment without one was never sealed.
+"""
+
+import json
+import lzma
+import os
+import zlib
+from datetime import datetime
+
+from py_fix_engine.fix_parser import extract_tag
+
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 9), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+FIX_TIME_FORMAT = "%Y%m%d-%H:%M:%S.%f"
+
+
+def _to_fix_time(value):
+    """Accept a datetime or a FIX UTCTimestamp string; return the string form."""
+    if isinstance(value, datetime):
+        return value.strftime(FIX_TIME_FORMAT)[:-3]
+    return value
+
+
+class ArchiveSegment:
+    def __init__(self, index_path):
+        """Read-only view of one sealed segment."""
+        self.index_path = index_path
+        with open(index_path, "r") as f:
+            self.index = json.load(f)
+        self.blocks_path = os.path.join(os.path.dirname(index_path), self.index["blocks_file"])
+        self.trading_day = self.index["trading_day"]
+        self._decompress = CODECS[self.index["codec"]][1]
+
+    def _read_block(self, f, block):
+        f.seek(block["offset"])
+        return json.loads(self._decompress(f.read(block["length"])))
+
+    def _scan(self, wanted):
+        """Yield [seq, sending_time, raw] from every block the predicate selects."""
+        with open(self.blocks_path, "rb") as f:
+            for block in self.index["blocks"]:
+                if wanted(block):
+                    yield from self._read_block(f, block)
+
+    def get_range(self, begin, end):
+        """Return archived messages in [begin, end] as {seq_num_int: raw_msg}.
+
+        If end is 0, return all messages from begin onwards.
+        """
+        end = end or float("inf")
+        return {
+            seq: raw
+            for seq, _, raw in self._scan(lambda b: b["last_seq"] >= begin and b["first_seq"] <= end)
+            if begin <= seq <= end
+        }
+
+    def get_time_range(self, start, end):
+        """Return archived messages with SendingTime in [start, end] as {seq_num_int: raw_msg}.
+
+        start and end may be datetimes or FIX UTCTimestamp strings.
+        """
+        start, end = _to_fix_time(start), _to_fix_time(end)
+        return {
+            seq: raw
+            for seq, sent, raw in self._scan(lambda b: b["max_time"] >= start and b["min_time"] <= end)
+            if start <= sent <= end
+        }
+
+
+class FixMessageArchive:
+    def __init__(self, store_id, archive_dir="archive", codec="zlib", block_size=256):
+        """
+        Args:
+            store_id: Same key the FixMessageStore uses.
+            archive_dir: Directory holding sealed segments.
+            codec: "zlib" (faster) or "lzma" (smaller).
+            block_size: Messages per compressed block. Larger blocks compress
+                better; smaller blocks make range lookups cheaper.
+        """
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec {codec!r}, expected one of {sorted(CODECS)}")
+        self.store_id = store_id
+        self.archive_dir = archive_dir
+        self.codec = codec
+        self.block_size = block_size
+
+    def seal(self, messages, trading_day):
+        """Compress {seq_num: raw_msg} into a new segment for trading_day (YYYYMMDD).
+
+        Sequence numbers already sealed for trading_day are skipped, so sealing
+        again after a rollover that was interrupted before the live store was
+        cleared does not archive the same messages twice.
+
+        Returns the index path, or None if there was nothing new to archive.
+        """
+        sealed = [
+            (block["first_seq"], block["last_seq"])
+            for segment in self.segments(trading_day)
+            for block in segment.index["blocks"]
+        ]
+        records = []
+        for seq, raw in sorted((int(k), v) for k, v in messages.items()):
+            if not any(first <= seq <= last for first, last in sealed):
+                records.append([seq, extract_tag(raw, 52) or "", raw])
+        if not records:
+            return None
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+        prefix = f"messages_{self.store_id}_{trading_day}_"
+        n = len([p for p in os.listdir(self.archive_dir) if p.startswith(prefix) and p.endswith(".index.json")])
+        base = os.path.join(self.archive_dir, f"{prefix}{n:03d}")
+        blocks_path = f"{base}.blocks"
+        index_path = f"{base}.index.json"
+
+        compress = CODECS[self.codec][0]
+        blocks = []
+        offset = 0
+        with open(blocks_path, "wb") as f:
+            for i in range(0, len(records), self.block_size):
+                chunk = records[i:i + self.block_size]
+                data = compress(json.dumps(chunk).encode())
+                f.write(data)
+                times = [r[1] for r in chunk]
+                blocks.append({
+                    "offset": offset,
+                    "length": len(data),
+                    "first_seq": chunk[0][0],
+                    "last_seq": chunk[-1][0],
+                    "min_time": min(times),
+                    "max_time": max(times),
+                })
+                offset += len(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        index = {
+            "store_id": self.store_id,
+            "trading_day": trading_day,
+            "codec": self.codec,
+            "block_size": self.block_size,
+            "message_count": len(records),
+            "blocks_file": os.path.basename(blocks_path),
+            "blocks": blocks,
+        }
+        tmp_path = f"{index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+        return index_path
+
+    def segments(self, trading_day=None):
+        """Return sealed segments, oldest first, optionally for one trading day."""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        prefix = f"messages_{self.store_id}_{trading_day or ''}"
+        paths = sorted(
+            os.path.join(self.archive_dir, p)
+            for p in os.listdir(self.archive_dir)
+            if p.startswith(prefix) and p.endswith(".index.json")
+        )
+        segments = [ArchiveSegment(p) for p in paths]
+        return [s for s in segments if s.index["store_id"] == self.store_id]
+
+    def get_range(self, trading_day, begin, end):
+        """Sequence numbers restart daily, so a seq range is looked up within one trading day."""
+        result = {}
+        for segment in self.segments(trading_day):
+            result.update(segment.get_range(begin, end))
+        return dict(sorted(result.items()))
+
+    def get_time_range(self, start, end):
+        """Return [(trading_day, seq_num, raw_msg), ...] sent in [start, end], across days."""
+        start, end = _to_fix_time(start), _to_fix_time(end)
+        result = []
+        for segment in self.segments():
+            # Nothing is sent before its trading day, so later days can be skipped cheaply
+            if segment.trading_day > end[:8]:
+                continue
+            for seq, raw in segment.get_time_range(start, end).items():
+                result.append((segment.trading_day, seq, raw))
+        return result
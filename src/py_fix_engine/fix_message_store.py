@@ -35,6 +35,20 @@ class FixMessageStore:
         self._messages[str(seq_num)] = raw_message
         self._save()
 
+    def clear(self):
+        """Drop every stored message."""
+        self._messages = {}
+        self._save()
+
+    def rollover(self, archive, trading_day):
+        """Seal every stored message into `archive` and start the live store fresh.
+
+        Returns the archive index path, or None if the store was empty.
+        """
+        index_path = archive.seal(self._messages, trading_day)
+        self.clear()
+        return index_path
+
     def get_range(self, begin, end):
         """Return messages in [begin, end] range as {seq_num_int: raw_msg}.
 
@@ -46,3 +60,17 @@ class FixMessageStore:
             if seq >= begin and (end == 0 or seq <= end):
                 result[seq] = value
         return dict(sorted(result.items()))
+
+
+class InMemoryMessageStore(FixMessageStore):
+    def __init__(self, sender_id):
+        """Same interface as FixMessageStore, but nothing is written to disk.
+
+        For simulated counterparties, whose own persistence would otherwise
+        dominate what a load test measures.
+        """
+        self.store_file = None
+        self._messages = {}
+
+    def _save(self):
+        pass
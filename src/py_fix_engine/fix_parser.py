@@ -2,7 +2,7 @@
 FIX message parser utilities.
 
 Responsibility: Purely structural parsing of raw FIX strings.
-Functions: parse(), extract_tag()
+Functions: parse(), extract_tag(), split_messages()
 """
 
 # Mapping of count tags to the tags that belong in each group entry.
@@ -25,6 +25,28 @@ def extract_tag(raw_str, tag_num):
     return None
 
 
+def split_messages(buffer):
+    """Split a raw byte-stream buffer into complete FIX messages.
+
+    A message ends at its CheckSum field (10=nnn followed by SOH).
+
+    Returns:
+        ([complete_msg_str, ...], remaining_partial_str)
+    """
+    messages = []
+    start = 0
+    while True:
+        cs_idx = buffer.find('\x0110=', start)
+        if cs_idx == -1:
+            break
+        end = buffer.find('\x01', cs_idx + 4)
+        if end == -1:
+            break
+        messages.append(buffer[start:end + 1])
+        start = end + 1
+    return messages, buffer[start:]
+
+
 def parse(raw_str):
     """Parse a raw FIX string into a structured dict.
 
@@ -3,10 +3,12 @@ import threading
 from py_fix_engine.fix_session import FixSession
 
 class FixServer:
-    def __init__(self, host='0.0.0.0', port=9001, server_id="SERVER"):
+    def __init__(self, host='0.0.0.0', port=9001, server_id="SERVER", **session_options):
         self.host = host
         self.port = port
         self.server_id = server_id
+        # Passed to every FixSession (e.g. high_watermark, outbound_policy)
+        self.session_options = session_options
         self.is_running = False
         self.sessions = []  # List to keep track of active client sessions
 
@@ -28,11 +30,7 @@ class FixServer:
                 client_sock, addr = server_sock.accept()
                 print(f"New connection from {addr}")
 
-                # Create a new session for this specific client
-                # Note: On the server, TargetID is the Client's ID
-                # Usually, we'd wait for a Logon to identify them, 
-                # but for now, we'll label them "CLIENT"
-                session = FixSession(client_sock, sender_id=self.server_id, target_id="MY_CLIENT")
+                session = self._create_session(client_sock)
                 session.start()
                 
                 self.sessions.append(session)
@@ -42,6 +40,18 @@ class FixServer:
                     print(f"Accept error: {e}")
                 break
 
+    def _create_session(self, client_sock):
+        """Build the session for a newly accepted connection. Subclasses may override."""
+        # Create a new session for this specific client
+        # Note: On the server, TargetID is the Client's ID
+        # Usually, we'd wait for a Logon to identify them, 
+        # but for now, we'll label them "CLIENT"
+        return FixSession(client_sock, sender_id=self.server_id, target_id="MY_CLIENT", **self.session_options)
+
+    def flow_metrics(self):
+        """Queue depth and send-buffer metrics for every live session."""
+        return [session.flow_metrics() for session in self.sessions if session.is_running]
+
     def stop(self):
         self.is_running = False
         for session in self.sessions:
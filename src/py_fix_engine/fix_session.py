@@ -2,34 +2,81 @@ import threading
 import time
 import os
 import json
+import select
 from datetime import datetime, timezone
+from py_fix_engine.fix_flow_control import BoundedQueue, FlowPolicy
 from py_fix_engine.fix_message import FixMessage
+from py_fix_engine.fix_message_archive import FixMessageArchive
 from py_fix_engine.fix_message_store import FixMessageStore
-from py_fix_engine.fix_parser import extract_tag
+from py_fix_engine.fix_parser import extract_tag, split_messages
+from py_fix_engine.fix_tags import ADMIN_MSG_TYPES
 
 class FixSession:
-    def __init__(self, sock, sender_id, target_id, heartbeat_interval=1):
+    # Upper bound on how many queued bytes the writer hands to one send() call
+    WRITE_BATCH_BYTES = 64 * 1024
+    # How long the dispatcher waits at the outbound hard limit before dropping the counterparty
+    DISPATCH_STALL_TIMEOUT = 5.0
+
+    def __init__(self, sock, sender_id, target_id, heartbeat_interval=1, store_id=None, verbose=True,
+                 high_watermark=10000, low_watermark=None, hard_limit=None,
+                 inbound_policy=FlowPolicy.BLOCK, outbound_policy=FlowPolicy.BLOCK,
+                 archive_dir="archive", archive_codec="zlib"):
         self.socket = sock
         self.sender_id = sender_id
         self.target_id = target_id
         self.heartbeat_interval = heartbeat_interval
+        self.verbose = verbose
+
+        # Files are keyed by sender_id unless several sessions share one sender
+        self.store_id = store_id or sender_id
 
         # A single state file for the session
-        self.state_file = f"session_{self.sender_id}.json"
+        self.state_file = f"session_{self.store_id}.json"
 
         self.is_running = True
+        self._started = False
         self.last_sent_time = 0
 
         # Load state (Outbound and Inbound)
         state = self._load_session_state()
         self.out_seq_num = state['out']
         self.expected_in_seq_num = state['in']
-
-        # Message store for resend support
-        self.message_store = FixMessageStore(self.sender_id)
+        # State files written before trading days were tracked belong to today
+        self.trading_day = state.get('date') or self._today()
+
+        # Message store for resend support, and the compressed tier it rolls into
+        self.message_store = self._create_message_store()
+        self.archive = FixMessageArchive(self.store_id, archive_dir, archive_codec)
+
+        # Serialises seq number assignment and socket writes across threads
+        self._send_lock = threading.RLock()
+
+        # State must not carry over from a previous day
+        if self.trading_day != self._today():
+            self.end_of_day_rollover()
+
+        # Optional callback for inbound application messages: fn(raw_msg_str)
+        self.on_app_message = None
+
+        # Bounded queues decouple socket I/O from message handling.
+        # The listener fills inbound, the dispatcher drains it; send_message()
+        # fills outbound, the writer drains it onto the non-blocking socket.
+        self.inbound_queue = BoundedQueue(f"{self.sender_id}<-{self.target_id} inbound",
+                                          high_watermark, low_watermark, inbound_policy, hard_limit)
+        self.outbound_queue = BoundedQueue(f"{self.sender_id}->{self.target_id} outbound",
+                                           high_watermark, low_watermark, outbound_policy, hard_limit)
+        self.send_buffer_bytes = 0   # Bytes taken off the queue but not yet accepted by the kernel
+        self.send_stalls = 0         # Times the socket send buffer was full
+        self.socket.setblocking(False)
 
         self.hb_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
         self.listener_thread = threading.Thread(target=self._listen_loop, daemon=True)
+        self.dispatch_thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self.writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+
+    def _create_message_store(self):
+        """Build the store used for resends. Subclasses may override."""
+        return FixMessageStore(self.store_id)
 
     def _load_session_state(self):
         """Loads both sequence numbers from a JSON file."""
@@ -46,7 +93,8 @@ class FixSession:
         """Saves both sequence numbers atomically."""
         state = {
             'out': self.out_seq_num,
-            'in': self.expected_in_seq_num
+            'in': self.expected_in_seq_num,
+            'date': self.trading_day
         }
         try:
             # Writing to a temp file then renaming is the "pro" way to prevent corruption
@@ -55,35 +103,106 @@ class FixSession:
         except IOError as e:
             print(f"Error saving session state: {e}")
 
+    def reset_session_state(self):
+        """Start again from sequence number 1 with an empty message store."""
+        with self._send_lock:
+            self.out_seq_num = 1
+            self.expected_in_seq_num = 1
+            self.message_store.clear()
+            self._save_session_state()
+
+    @staticmethod
+    def _today():
+        return datetime.now(timezone.utc).strftime("%Y%m%d")
+
+    def end_of_day_rollover(self):
+        """Archive the trading day's messages and start the next day from sequence number 1.
+
+        Between connections only: runs automatically when a session is created
+        on a new day, and may be called on a session that has been stopped.
+        Resetting a connected session would leave the counterparty expecting
+        the old sequence numbers, so that raises RuntimeError; log out,
+        stop() and reconnect instead.
+        """
+        if self._started and self.is_running:
+            raise RuntimeError("end_of_day_rollover() must not run on a connected session; stop() it first")
+        with self._send_lock:
+            index_path = self.message_store.rollover(self.archive, self.trading_day)
+            if index_path:
+                print(f"Archived {self.trading_day} messages to {index_path}")
+            self.trading_day = self._today()
+            self.reset_session_state()
+
     def start(self):
+        self._started = True
         self.hb_thread.start()
         self.listener_thread.start()
+        self.dispatch_thread.start()
+        self.writer_thread.start()
+
+    def flow_metrics(self):
+        """Queue depths and send-buffer state for monitoring."""
+        return {
+            "inbound": self.inbound_queue.metrics(),
+            "outbound": self.outbound_queue.metrics(),
+            "send_buffer_bytes": self.send_buffer_bytes,
+            "send_stalls": self.send_stalls,
+        }
+
+    def _enqueue_raw(self, data: bytes):
+        """Hand encoded bytes to the writer thread. Returns False if the queue refused them.
+
+        Never blocks, so it is safe under _send_lock and keeps queue order equal
+        to seq order. Callers apply BLOCK backpressure with _wait_for_outbound_room().
+        """
+        if self.outbound_queue.put(data, block=False):
+            return True
+        # Under BLOCK a refusal means the hard limit was reached
+        if self.outbound_queue.policy != FlowPolicy.DROP and self.is_running:
+            print(f"!!! FLOW: outbound queue full, disconnecting {self.target_id}")
+            self.stop()
+        return False
+
+    def _wait_for_outbound_room(self):
+        """BLOCK backpressure for callers of send_message(), applied outside _send_lock.
+
+        The dispatcher thread may overshoot the high watermark: if two sessions
+        both filled up and each dispatcher waited on its outbound queue, neither
+        would read the other's messages. At the hard limit it pauses, which
+        stops inbound dispatching so TCP pushes back on the counterparty, and
+        gives up after DISPATCH_STALL_TIMEOUT; the next enqueue then disconnects.
+        """
+        if threading.current_thread() is not self.dispatch_thread:
+            self.outbound_queue.wait_for_room()
+        elif len(self.outbound_queue) >= self.outbound_queue.hard_limit:
+            self.outbound_queue.wait_for_room(self.DISPATCH_STALL_TIMEOUT)
 
     def send_message(self, msg: FixMessage):
         if not self.is_running: return
 
-        msg.add_tag(49, self.sender_id)
-        msg.add_tag(56, self.target_id)
-        msg.add_tag(34, str(self.out_seq_num))
+        with self._send_lock:
+            msg.add_tag(49, self.sender_id)
+            msg.add_tag(56, self.target_id)
+            msg.add_tag(34, str(self.out_seq_num))
 
-        now = datetime.now(timezone.utc)
-        msg.add_tag(52, now.strftime("%Y%m%d-%H:%M:%S.%f")[:-3])
+            now = datetime.now(timezone.utc)
+            msg.add_tag(52, now.strftime("%Y%m%d-%H:%M:%S.%f")[:-3])
 
-        raw_msg = msg.encode()
+            raw_msg = msg.encode()
 
-        # Persist to message store before incrementing
-        self.message_store.store(self.out_seq_num, raw_msg)
+            # Persist to message store before incrementing
+            self.message_store.store(self.out_seq_num, raw_msg)
 
-        # Increment outbound and save the WHOLE state
-        self.out_seq_num += 1
-        self._save_session_state()
+            # Increment outbound and save the WHOLE state
+            self.out_seq_num += 1
+            self._save_session_state()
 
-        try:
-            self.socket.sendall(raw_msg.encode())
-            self.last_sent_time = time.time()
-            print(f"SENT: {raw_msg.replace(FixMessage.SOH, '|')}")
-        except Exception as e:
-            self.stop()
+            # A dropped message is still in the store, so a Resend Request recovers it.
+            # The writer logs SENT and updates last_sent_time once the socket accepts it.
+            queued = self._enqueue_raw(raw_msg.encode())
+
+        if queued:
+            self._wait_for_outbound_room()
 
     def _validate_inbound_seq(self, msg_str):
         try:
@@ -103,7 +222,9 @@ class FixSession:
 
             if msg_seq_num > self.expected_in_seq_num:
                 print(f"!!! SEQ GAP: Received {msg_seq_num}, expected {self.expected_in_seq_num}. Sending Resend Request.")
-                self._send_resend_request(self.expected_in_seq_num, 0)
+                # The gap is known to end just before this message; asking for more
+                # would replay everything the counterparty sends meanwhile
+                self._send_resend_request(self.expected_in_seq_num, msg_seq_num - 1)
                 # Jump forward to accept the current message
                 self.expected_in_seq_num = msg_seq_num
 
@@ -148,17 +269,18 @@ class FixSession:
 
         seq = begin
         while seq <= actual_end:
+            if not self.is_running:
+                return
             if seq in stored:
                 # Resend the original message with PossDupFlag=Y injected
                 original = stored[seq]
                 resend_str = self._inject_poss_dup(original)
-                try:
-                    self.socket.sendall(resend_str.encode())
-                    self.last_sent_time = time.time()
+                with self._send_lock:
+                    queued = self._enqueue_raw(resend_str.encode())
+                if queued:
                     print(f"RESENT (PossDup): seq={seq}")
-                except Exception:
-                    self.stop()
-                    return
+                    # A large resend is paced by the same outbound limit as replies
+                    self._wait_for_outbound_room()
                 seq += 1
             else:
                 # Find the extent of the gap in the store
@@ -207,12 +329,11 @@ class FixSession:
         msg.add_tag(52, now.strftime("%Y%m%d-%H:%M:%S.%f")[:-3])
 
         raw_msg = msg.encode()
-        try:
-            self.socket.sendall(raw_msg.encode())
-            self.last_sent_time = time.time()
+        with self._send_lock:
+            queued = self._enqueue_raw(raw_msg.encode())
+        if queued:
             print(f"SENT Gap Fill: {gap_start_seq} -> {new_seq_no}")
-        except Exception:
-            self.stop()
+            self._wait_for_outbound_room()
 
     def _handle_sequence_reset(self, msg_str):
         """Handle an incoming Sequence Reset (35=4).
@@ -228,6 +349,10 @@ class FixSession:
         gap_fill = extract_tag(msg_str, 123)
 
         if gap_fill == "Y":
+            if new_seq <= self.expected_in_seq_num:
+                # Already past this gap (we jumped forward when it was detected)
+                print(f"Sequence Reset - Gap Fill: ignoring NewSeqNo {new_seq}, expected seq is {self.expected_in_seq_num}")
+                return
             print(f"Sequence Reset - Gap Fill: advancing expected seq from {self.expected_in_seq_num} to {new_seq}")
         else:
             print(f"Sequence Reset - Reset: advancing expected seq from {self.expected_in_seq_num} to {new_seq}")
@@ -236,44 +361,130 @@ class FixSession:
         self._save_session_state()
 
     def _listen_loop(self):
+        # TCP is a byte stream: one recv() may hold a partial message or several
+        buffer = ""
         while self.is_running:
             try:
+                readable, _, _ = select.select([self.socket], [], [], 0.1)
+                if not readable:
+                    continue
+
                 data = self.socket.recv(4096)
                 if not data:
                     self.stop()
                     break
 
-                decoded_msg = data.decode('utf-8', errors='ignore')
-                print(f"RECV: {decoded_msg.replace(chr(1), '|')}")
-
-                # Check message type before sequence validation
-                msg_type = extract_tag(decoded_msg, 35)
+                buffer += data.decode('utf-8', errors='ignore')
+                messages, buffer = split_messages(buffer)
+
+                # Under BLOCK this stops us reading, so TCP pushes back on the sender
+                for decoded_msg in messages:
+                    if not self.inbound_queue.put(decoded_msg) and self.inbound_queue.policy == FlowPolicy.DISCONNECT:
+                        print(f"!!! FLOW: inbound queue full, disconnecting {self.target_id}")
+                        self.stop()
+                        break
+            except BlockingIOError:
+                continue
+            except:
+                self.stop()
+                break
 
-                if msg_type == "2":
-                    # Resend Request — handle before seq validation
-                    self._handle_resend_request(decoded_msg)
-                    continue
+    def _dispatch_loop(self):
+        while self.is_running:
+            decoded_msg = self.inbound_queue.get(timeout=0.1)
+            if decoded_msg is None:
+                continue
+            try:
+                if not self._handle_inbound(decoded_msg):
+                    self.stop()
+                    break
+            except Exception as e:
+                print(f"Inbound handling error: {e}")
+                self.stop()
+                break
 
-                if msg_type == "4":
-                    # Sequence Reset — handle directly (adjusts our expected seq)
-                    self._handle_sequence_reset(decoded_msg)
+    def _writer_loop(self):
+        pending = b""
+        batch = []
+        # After stop() the writer keeps draining; stop() bounds how long it waits
+        while self.is_running or pending or len(self.outbound_queue):
+            if not pending:
+                data = self.outbound_queue.get(timeout=0.1)
+                if data is None:
                     continue
+                # Coalesce whatever else is already queued into the same write
+                batch = [data]
+                size = len(data)
+                while size < self.WRITE_BATCH_BYTES:
+                    data = self.outbound_queue.get_nowait()
+                    if data is None:
+                        break
+                    batch.append(data)
+                    size += len(data)
+                pending = b"".join(batch)
 
-                if not self._validate_inbound_seq(decoded_msg):
-                    self.stop()
-                    break
+            try:
+                sent = self.socket.send(pending)
+                pending = pending[sent:]
+            except BlockingIOError:
+                # Kernel send buffer is full: the counterparty is reading slowly
+                self.send_stalls += 1
+                select.select([], [self.socket], [], 0.1)
             except:
+                self.send_buffer_bytes = len(pending)
                 self.stop()
                 break
+            self.send_buffer_bytes = len(pending)
+
+            if not pending and batch:
+                self.last_sent_time = time.time()
+                if self.verbose:
+                    for data in batch:
+                        print(f"SENT: {data.decode().replace(FixMessage.SOH, '|')}")
+                batch = []
+
+    def _handle_inbound(self, decoded_msg):
+        """Dispatch a single complete inbound message. Returns False to drop the session."""
+        if self.verbose:
+            print(f"RECV: {decoded_msg.replace(chr(1), '|')}")
+
+        # Check message type before sequence validation
+        msg_type = extract_tag(decoded_msg, 35)
+
+        if msg_type == "2":
+            # Resend Request — handle before seq validation, but it still consumes a seq number
+            self._handle_resend_request(decoded_msg)
+            return self._validate_inbound_seq(decoded_msg)
+
+        if msg_type == "4":
+            # Sequence Reset — handle directly (adjusts our expected seq)
+            self._handle_sequence_reset(decoded_msg)
+            return True
+
+        if not self._validate_inbound_seq(decoded_msg):
+            return False
+
+        if self.on_app_message and msg_type not in ADMIN_MSG_TYPES:
+            self.on_app_message(decoded_msg)
+        return True
 
     def _heartbeat_loop(self):
         while self.is_running:
             time.sleep(0.1)
+            # Anything still queued or unsent will go out anyway; don't pile heartbeats on it
+            if len(self.outbound_queue) or self.send_buffer_bytes:
+                continue
             if time.time() - self.last_sent_time >= self.heartbeat_interval:
                 hb = FixMessage(msg_type="0", sender_id=self.sender_id, target_id=self.target_id)
                 self.send_message(hb)
 
-    def stop(self):
+    def stop(self, drain_timeout=2.0):
+        """Stop the session, giving the writer up to drain_timeout seconds to flush queued messages."""
         self.is_running = False
+        self.inbound_queue.close()
+        self.outbound_queue.close()
+        writer = self.writer_thread
+        if writer.is_alive() and threading.current_thread() is not writer:
+            writer.join(drain_timeout)
         try: self.socket.close()
         except: pass
@@ -0,0 +1,423 @@
+"""
+Local FIX venue simulator for load and soak testing.
+
+Responsibility: Stand in for a live venue so engine releases can be
+qualified against realistic traffic.
+
+Design:
+- `VenueSimulator` is a FixServer whose sessions are `VenueSession`s.
+  Each NewOrderSingle is acked with an ExecutionReport and then filled,
+  optionally through a number of partial fills.
+- Faults are injected at two levels: FIX (sequence gaps, PossDup
+  duplicates) in `VenueSession`, and TCP (split and coalesced segments,
+  slow reads) in `FaultySocket`.
+- `LoadGenerator` drives N client sessions at a target order rate and
+  reports sustained throughput and ack/fill latency.
+"""
+
+import random
+import socket
+import threading
+import time
+from collections import OrderedDict
+
+from py_fix_engine.fix_message import FixMessage
+from py_fix_engine.fix_message_store import InMemoryMessageStore
+from py_fix_engine.fix_parser import extract_tag, parse
+from py_fix_engine.fix_server import FixServer
+from py_fix_engine.fix_session import FixSession
+from py_fix_engine.fix_tags import FixMsgType, FixTag
+
+
+class FaultySocket:
+    def __init__(self, sock, split_every=0, coalesce_every=0, read_delay=0.0):
+        """Socket wrapper that mangles TCP segmentation and slows reads.
+
+        Args:
+            sock: The connected socket to wrap.
+            split_every: Send every Nth write as two separate segments (0 = off).
+            coalesce_every: Hold every Nth write back and send it together with
+                the next one (0 = off). A held write goes out with the next
+                write, at the latest the next heartbeat.
+            read_delay: Seconds to sleep before each recv().
+        """
+        self._sock = sock
+        self.split_every = split_every
+        self.coalesce_every = coalesce_every
+        self.read_delay = read_delay
+        self._writes = 0
+        self._held = b""
+
+        # Without this, Nagle may merge the halves of a split write back together
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def send(self, data):
+        """Same contract as socket.send(): returns how many bytes of `data` were taken."""
+        self._writes += 1
+
+        if self.coalesce_every and self._writes % self.coalesce_every == 0:
+            self._held += data
+            return len(data)
+
+        if self.split_every and self._writes % self.split_every == 0 and len(data) > 1:
+            # Take only a prefix; the caller sends the rest as a second segment
+            data = data[:random.randint(1, len(data) - 1)]
+            time.sleep(0.001)
+
+        held = len(self._held)
+        sent = self._sock.send(self._held + data)
+        if sent < held:
+            self._held = self._held[sent:]
+            return 0
+        self._held = b""
+        return sent - held
+
+    def recv(self, bufsize):
+        if self.read_delay:
+            time.sleep(self.read_delay)
+        return self._sock.recv(bufsize)
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+
+class VenueSession(FixSession):
+    def __init__(self, sock, sender_id, target_id, partial_fills=0, fill_ratio=1.0,
+                 fill_price="100.00", gap_every=0, dup_every=0, persist=False, **kwargs):
+        """A server-side session that behaves like an exchange.
+
+        Args:
+            partial_fills: Partial fills sent before the final fill of each order.
+            fill_ratio: Fraction of orders that get filled; the rest stay New.
+            fill_price: LastPx used when the order carries no Price (44).
+            gap_every: Skip an outbound sequence number every Nth message (0 = off).
+            dup_every: Resend every Nth message again with PossDupFlag=Y (0 = off).
+            persist: Write the message store and session state to disk like a real
+                session. Off by default so the venue is not the bottleneck it measures.
+        """
+        # Read by the persistence hooks, which run during FixSession.__init__
+        self.persist = persist
+        super().__init__(sock, sender_id, target_id, **kwargs)
+        self.partial_fills = partial_fills
+        self.fill_ratio = fill_ratio
+        self.fill_price = fill_price
+        self.gap_every = gap_every
+        self.dup_every = dup_every
+
+        self._sent = 0
+        self._next_order_id = 1
+        self.on_app_message = self._on_app_message
+
+    def _create_message_store(self):
+        if self.persist:
+            return super()._create_message_store()
+        return InMemoryMessageStore(self.store_id)
+
+    def _load_session_state(self):
+        if self.persist:
+            return super()._load_session_state()
+        return {'out': 1, 'in': 1}
+
+    def _save_session_state(self):
+        if self.persist:
+            super()._save_session_state()
+
+    def send_message(self, msg: FixMessage):
+        # The lock is not held across super().send_message(), which may wait for queue room
+        with self._send_lock:
+            self._sent += 1
+            sent = self._sent
+            if self.gap_every and sent % self.gap_every == 0:
+                # Burn a sequence number; it is never stored, so a resend gap-fills it
+                self.out_seq_num += 1
+
+        super().send_message(msg)
+
+        if self.dup_every and sent % self.dup_every == 0 and self.is_running:
+            with self._send_lock:
+                original = self.message_store.get_range(self.out_seq_num - 1, self.out_seq_num - 1)
+                for raw in original.values():
+                    self._enqueue_raw(self._inject_poss_dup(raw).encode())
+
+    def _handle_inbound(self, decoded_msg):
+        # Learn the counterparty's CompID from its Logon and answer it
+        if extract_tag(decoded_msg, 35) == FixMsgType.LOGON:
+            self.target_id = extract_tag(decoded_msg, 49) or self.target_id
+            if not super()._handle_inbound(decoded_msg):
+                return False
+            logon = FixMessage(msg_type=FixMsgType.LOGON, sender_id=self.sender_id, target_id=self.target_id)
+            logon.add_tag(FixTag.ENCRYPT_METHOD, "0")
+            logon.add_tag(FixTag.HEARTBT_INT, str(self.heartbeat_interval))
+            self.send_message(logon)
+            return True
+        return super()._handle_inbound(decoded_msg)
+
+    def _on_app_message(self, msg_str):
+        if extract_tag(msg_str, 35) != FixMsgType.NEW_ORDER_SINGLE:
+            return
+        if extract_tag(msg_str, FixTag.POSS_DUP_FLAG) == "Y":
+            return
+
+        order = parse(msg_str)["tags"]
+        order_id = f"SIM{self._next_order_id}"
+        self._next_order_id += 1
+        qty = int(float(order.get(FixTag.ORDER_QTY, "100")))
+        price = order.get(FixTag.PRICE, self.fill_price)
+
+        self._send_execution_report(order, order_id, exec_type="0", last_qty=0, cum_qty=0, qty=qty, price=price)
+
+        if random.random() >= self.fill_ratio:
+            return
+
+        cum_qty = 0
+        slices = self.partial_fills + 1
+        for i in range(slices):
+            last_qty = qty - cum_qty if i == slices - 1 else qty // slices
+            if last_qty <= 0:
+                continue
+            cum_qty += last_qty
+            exec_type = "2" if cum_qty == qty else "1"
+            self._send_execution_report(order, order_id, exec_type, last_qty, cum_qty, qty, price)
+
+    def _send_execution_report(self, order, order_id, exec_type, last_qty, cum_qty, qty, price):
+        er = FixMessage(msg_type=FixMsgType.EXECUTION_REPORT, sender_id=self.sender_id, target_id=self.target_id)
+        er.add_tag(FixTag.ORDER_ID, order_id)
+        er.add_tag(FixTag.CL_ORD_ID, order.get(FixTag.CL_ORD_ID, ""))
+        er.add_tag(FixTag.EXEC_ID, f"{order_id}-{cum_qty}")
+        er.add_tag(FixTag.EXEC_TRANS_TYPE, "0")
+        er.add_tag(FixTag.EXEC_TYPE, exec_type)
+        er.add_tag(FixTag.ORD_STATUS, exec_type)
+        er.add_tag(FixTag.SYMBOL, order.get(FixTag.SYMBOL, ""))
+        er.add_tag(FixTag.SIDE, order.get(FixTag.SIDE, "1"))
+        er.add_tag(FixTag.ORDER_QTY, str(qty))
+        er.add_tag(FixTag.LAST_SHARES, str(last_qty))
+        er.add_tag(FixTag.LAST_PX, price)
+        er.add_tag(FixTag.CUM_QTY, str(cum_qty))
+        er.add_tag(FixTag.LEAVES_QTY, str(qty - cum_qty))
+        er.add_tag(FixTag.AVG_PX, price if cum_qty else "0")
+        self.send_message(er)
+
+
+class VenueSimulator(FixServer):
+    def __init__(self, host='0.0.0.0', port=9001, server_id="SIM_VENUE", heartbeat_interval=1,
+                 split_every=0, coalesce_every=0, read_delay=0.0, **session_options):
+        """FixServer that hands every connection to a VenueSession.
+
+        TCP fault options are passed to FaultySocket; the rest (partial_fills,
+        fill_ratio, gap_every, dup_every, persist, high_watermark, ...) to VenueSession.
+        """
+        super().__init__(host, port, server_id, **session_options)
+        self.heartbeat_interval = heartbeat_interval
+        self.socket_options = {
+            "split_every": split_every,
+            "coalesce_every": coalesce_every,
+            "read_delay": read_delay,
+        }
+        self._connections = 0
+
+    def _create_session(self, client_sock):
+        self._connections += 1
+        session = VenueSession(
+            FaultySocket(client_sock, **self.socket_options),
+            sender_id=self.server_id,
+            target_id="UNKNOWN",
+            heartbeat_interval=self.heartbeat_interval,
+            store_id=f"{self.server_id}_{self._connections}",
+            verbose=False,
+            **self.session_options,
+        )
+        # Every simulated connection starts a fresh FIX session
+        session.reset_session_state()
+        return session
+
+
+class LatencyReservoir:
+    def __init__(self, size=10000):
+        """Fixed-size uniform sample of latencies (reservoir sampling), so soak runs stay bounded."""
+        self.size = size
+        self.count = 0
+        self.max = None
+        self._samples = []
+
+    def add(self, value):
+        self.count += 1
+        if self.max is None or value > self.max:
+            self.max = value
+        if len(self._samples) < self.size:
+            self._samples.append(value)
+        else:
+            i = random.randrange(self.count)
+            if i < self.size:
+                self._samples[i] = value
+
+    def percentiles_ms(self):
+        if not self._samples:
+            return {"p50_ms": None, "p99_ms": None, "max_ms": None}
+        samples = sorted(self._samples)
+        return {
+            "p50_ms": samples[len(samples) // 2] * 1000,
+            "p99_ms": samples[int(len(samples) * 0.99)] * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class LoadGenerator:
+    def __init__(self, host='localhost', port=9001, num_clients=1, rate=100, duration=10,
+                 target_id="SIM_VENUE", symbol="AAPL", order_qty=100, max_open_orders=100000):
+        """Drive N client sessions at a combined target NewOrderSingle rate.
+
+        Args:
+            rate: Orders per second across all clients.
+            duration: Seconds to send for.
+            max_open_orders: Cap on orders tracked while awaiting their fill. Orders
+                the venue never fills are evicted oldest first beyond this.
+        """
+        self.host = host
+        self.port = port
+        self.num_clients = num_clients
+        self.rate = rate
+        self.duration = duration
+        self.target_id = target_id
+        self.symbol = symbol
+        self.order_qty = order_qty
+        self.max_open_orders = max_open_orders
+
+        self.sessions = []
+        self._lock = threading.Lock()
+        # ClOrdID -> [sent_at, acked]; removed on the final fill
+        self._open = OrderedDict()
+        self._ack_latency = LatencyReservoir()
+        self._fill_latency = LatencyReservoir()
+        self._start = None
+        self._last_reply = None
+        self._exec_reports = 0
+        self._poss_dups = 0
+        self._orders_sent = 0
+        self._evicted = 0
+
+    def _connect(self, client_no, attempts=50):
+        sender_id = f"SIM_CLIENT_{client_no}"
+        for _ in range(attempts):
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=5)
+                sock.settimeout(None)
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            raise ConnectionError(f"{sender_id} could not connect to {self.host}:{self.port}")
+
+        session = FixSession(sock, sender_id, self.target_id, verbose=False)
+        session.reset_session_state()
+        session.on_app_message = self._on_app_message
+        session.start()
+
+        logon = FixMessage(msg_type=FixMsgType.LOGON, sender_id=sender_id, target_id=self.target_id)
+        logon.add_tag(FixTag.ENCRYPT_METHOD, "0")
+        logon.add_tag(FixTag.HEARTBT_INT, str(session.heartbeat_interval))
+        session.send_message(logon)
+        return session
+
+    def _on_app_message(self, msg_str):
+        now = time.perf_counter()
+        if extract_tag(msg_str, 35) != FixMsgType.EXECUTION_REPORT:
+            return
+        with self._lock:
+            if extract_tag(msg_str, FixTag.POSS_DUP_FLAG) == "Y":
+                self._poss_dups += 1
+                return
+            self._exec_reports += 1
+            cl_ord_id = extract_tag(msg_str, FixTag.CL_ORD_ID)
+            order = self._open.get(cl_ord_id)
+            if order is None:
+                return
+            exec_type = extract_tag(msg_str, FixTag.EXEC_TYPE)
+            if exec_type == "0" and not order[1]:
+                order[1] = True
+                self._ack_latency.add(now - order[0])
+                self._last_reply = now
+            elif exec_type == "2":
+                del self._open[cl_ord_id]
+                self._fill_latency.add(now - order[0])
+                self._last_reply = now
+
+    def _drive(self, client_no, session, start):
+        interval = self.num_clients / self.rate
+        # Stagger clients so their orders interleave rather than burst together
+        next_send = start + interval * client_no / self.num_clients
+        n = 0
+        while session.is_running:
+            now = time.perf_counter()
+            if now - start >= self.duration:
+                break
+            if now < next_send:
+                time.sleep(next_send - now)
+                continue
+
+            n += 1
+            cl_ord_id = f"C{client_no}-{n}"
+            order = FixMessage(msg_type=FixMsgType.NEW_ORDER_SINGLE, sender_id=session.sender_id, target_id=self.target_id)
+            order.add_tag(FixTag.CL_ORD_ID, cl_ord_id)
+            order.add_tag(FixTag.HANDL_INST, "1")
+            order.add_tag(FixTag.SYMBOL, self.symbol)
+            order.add_tag(FixTag.SIDE, "1")
+            order.add_tag(FixTag.ORDER_QTY, str(self.order_qty))
+            order.add_tag(FixTag.ORD_TYPE, "1")
+            with self._lock:
+                self._open[cl_ord_id] = [time.perf_counter(), False]
+                self._orders_sent += 1
+                if len(self._open) > self.max_open_orders:
+                    self._open.popitem(last=False)
+                    self._evicted += 1
+            session.send_message(order)
+            next_send += interval
+
+    def run(self, drain=1.0):
+        """Connect, send for `duration` seconds, wait `drain` seconds for replies, report."""
+        self.sessions = [self._connect(i) for i in range(self.num_clients)]
+        # Let the Logon exchange settle before timing anything
+        time.sleep(0.5)
+
+        start = self._start = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._drive, args=(i, session, start), daemon=True)
+            for i, session in enumerate(self.sessions)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        time.sleep(drain)
+
+        for session in self.sessions:
+            session.stop()
+        return self.report(elapsed)
+
+    def report(self, elapsed):
+        """Offered load is what was sent; sustained throughput is what the venue answered.
+
+        acked_per_s and filled_per_s are measured over the same window, from the
+        first order to the last ack or fill received (including the drain period).
+        """
+        with self._lock:
+            acked = self._ack_latency.count
+            filled = self._fill_latency.count
+            window = (self._last_reply - self._start) if self._last_reply else elapsed
+            return {
+                "clients": self.num_clients,
+                "send_window_s": elapsed,
+                "orders_sent": self._orders_sent,
+                "offered_orders_per_s": self._orders_sent / elapsed if elapsed else 0,
+                "reply_window_s": window,
+                "acked": acked,
+                "acked_per_s": acked / window if window else 0,
+                "filled": filled,
+                "filled_per_s": filled / window if window else 0,
+                "outstanding_unacked": self._orders_sent - acked,
+                "exec_reports": self._exec_reports,
+                "poss_dups": self._poss_dups,
+                "evicted_unfilled": self._evicted,
+                "ack_latency": self._ack_latency.percentiles_ms(),
+                "fill_latency": self._fill_latency.percentiles_ms(),
+            }
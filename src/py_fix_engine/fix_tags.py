@@ -38,6 +38,13 @@ class FixTag:
     ORDER_ID           = 37  # Exchange Order ID
     EXEC_ID            = 17  
     ORD_STATUS         = 39  # 0=New, 1=Partially Filled, 2=Filled 
+    EXEC_TYPE          = 150 # 0=New, 1=Partial Fill, 2=Fill
+    EXEC_TRANS_TYPE    = 20  # 0=New
+    CUM_QTY            = 14
+    LEAVES_QTY         = 151
+    LAST_SHARES        = 32
+    LAST_PX            = 31
+    AVG_PX             = 6
 
 
 class FixMsgType:
@@ -49,4 +56,16 @@ class FixMsgType:
     LOGOUT           = "5"
     EXECUTION_REPORT = "8"
     LOGON            = "A"
-    NEW_ORDER_SINGLE = "D"
\ No newline at end of file
+    NEW_ORDER_SINGLE = "D"
+
+
+# Session-level message types handled by FixSession itself
+ADMIN_MSG_TYPES = {
+    FixMsgType.HEARTBEAT,
+    FixMsgType.TEST_REQUEST,
+    FixMsgType.RESEND_REQUEST,
+    FixMsgType.REJECT,
+    FixMsgType.SEQUENCE_RESET,
+    FixMsgType.LOGOUT,
+    FixMsgType.LOGON,
+}
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from py_fix_engine.fix_message import FixMessage
+from py_fix_engine.fix_message_store import FixMessageStore
+from py_fix_engine.fix_message_archive import FixMessageArchive
+
+# Runs in a scratch directory so the demo store does not touch real state
+os.chdir(tempfile.mkdtemp())
+
+# 1. Fill a live store with a day's worth of ExecutionReports, the way a session does
+store = FixMessageStore("ARCHIVE_DEMO")
+start = datetime(2026, 1, 5, 13, 30, tzinfo=timezone.utc)
+for seq in range(1, 2001):
+    er = FixMessage(msg_type="8", sender_id="ARCHIVE_DEMO", target_id="CLIENT")
+    er.add_tag(34, str(seq))
+    er.add_tag(52, (start + timedelta(milliseconds=100 * seq)).strftime("%Y%m%d-%H:%M:%S.%f")[:-3])
+    er.add_tag(37, f"SIM{seq // 4}")
+    er.add_tag(11, f"C0-{seq // 4}")
+    er.add_tag(39, str(seq % 3))
+    er.add_tag(55, "AAPL")
+    er.add_tag(38, "100")
+    store.store(seq, er.encode())
+live_size = os.path.getsize(store.store_file)
+messages = store.get_range(1, 0)
+
+# 2. Compare codecs on the same day
+for codec in ("zlib", "lzma"):
+    archive = FixMessageArchive("ARCHIVE_DEMO", archive_dir=f"archive_{codec}", codec=codec)
+    t0 = time.perf_counter()
+    index_path = archive.seal(messages, "20260105")
+    seal_s = time.perf_counter() - t0
+    blocks_size = os.path.getsize(index_path.replace(".index.json", ".blocks"))
+    print(f"{codec}: {live_size} -> {blocks_size} bytes ({live_size / blocks_size:.1f}x) in {seal_s:.3f}s")
+
+# A rollover interrupted before the store was cleared seals the same day again; nothing is duplicated
+print(f"re-seal of an already sealed day: {archive.seal(messages, '20260105')}")
+
+# 3. End-of-day rollover seals the live store into a fresh archive
+archive = FixMessageArchive("ARCHIVE_DEMO", archive_dir="archive")
+index_path = store.rollover(archive, "20260105")
+print(f"Rolled over into {index_path}")
+print(f"Live store after rollover: {len(store.get_range(1, 0))} messages")
+
+# 4. Fetch without decompressing the whole day
+t0 = time.perf_counter()
+by_seq = archive.get_range("20260105", 1000, 1010)
+by_time = archive.get_time_range("20260105-13:31:00.000", "20260105-13:31:01.000")
+print(f"seq 1000-1010: {len(by_seq)} msgs, 1s window: {len(by_time)} msgs "
+      f"in {(time.perf_counter() - t0) * 1000:.1f}ms")
@@ -0,0 +1,61 @@
+import os
+import socket
+import tempfile
+import threading
+from py_fix_engine.fix_flow_control import FlowPolicy
+from py_fix_engine.fix_message import FixMessage
+from py_fix_engine.fix_session import FixSession
+
+# Runs in a scratch directory so the demo sessions do not touch real state
+os.chdir(tempfile.mkdtemp())
+
+MESSAGES = 400
+PAYLOAD = "x" * 2000   # 400 x 2KB is more than a socketpair's kernel buffers hold
+
+
+def blast(session):
+    for i in range(MESSAGES):
+        msg = FixMessage(msg_type="8", sender_id=session.sender_id, target_id=session.target_id)
+        msg.add_tag(58, PAYLOAD)
+        session.send_message(msg)
+
+
+def drain(sock):
+    """Read everything the session sends until it closes the connection."""
+    sock.settimeout(3)
+    try:
+        while sock.recv(65536):
+            pass
+    except OSError:
+        pass
+
+
+for policy in (FlowPolicy.DROP, FlowPolicy.DISCONNECT, FlowPolicy.BLOCK):
+    print(f"\n=== outbound_policy={policy} ===")
+
+    # 1. A session whose peer never reads
+    sock, slow_peer = socket.socketpair()
+    session = FixSession(sock, f"FLOW_{policy}", "SLOW_PEER", heartbeat_interval=30, verbose=False,
+                         high_watermark=50, low_watermark=10, outbound_policy=policy)
+    session.reset_session_state()
+    session.start()
+
+    producer = threading.Thread(target=blast, args=(session,), daemon=True)
+    producer.start()
+    producer.join(10)
+
+    metrics = session.flow_metrics()
+    print(f"producer finished={not producer.is_alive()}  session running={session.is_running}")
+    print(f"outbound: {metrics['outbound']}")
+    print(f"send_buffer_bytes={metrics['send_buffer_bytes']}  send_stalls={metrics['send_stalls']}")
+
+    # 2. The peer starts reading: a blocked producer resumes once the queue reaches the low watermark
+    reader = threading.Thread(target=drain, args=(slow_peer,), daemon=True)
+    reader.start()
+    producer.join(30)
+    print(f"after peer reads: producer finished={not producer.is_alive()}  "
+          f"depth={session.outbound_queue.metrics()['depth']}  blocked_time_s={session.outbound_queue.blocked_time:.2f}")
+
+    session.stop()
+    reader.join()
+    slow_peer.close()
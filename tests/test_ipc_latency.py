@@ -0,0 +1,10 @@
+from py_fix_engine.fix_ipc import run_loopback_benchmark
+
+# Loopback latency through two shared-memory rings and an echo process.
+# The guard is required because the echo worker is a separate process.
+if __name__ == "__main__":
+    stats = run_loopback_benchmark(count=100000, payload_size=200)
+
+    print(f"Round trips: {stats['count']}")
+    print(f"min={stats['min_us']:.1f}us  p50={stats['p50_us']:.1f}us  "
+          f"p99={stats['p99_us']:.1f}us  max={stats['max_us']:.1f}us")
@@ -0,0 +1,30 @@
+import os
+import tempfile
+import time
+from py_fix_engine.fix_simulator import VenueSimulator, LoadGenerator
+
+# Runs in a scratch directory so the client session files do not touch real state
+os.chdir(tempfile.mkdtemp())
+
+# 1. Start a simulated venue with partial fills and a sprinkling of faults
+venue = VenueSimulator(
+    host="0.0.0.0", port=9002,
+    partial_fills=2,      # New -> Partial -> Partial -> Filled
+    fill_ratio=0.9,       # 10% of orders are acked but never filled
+    gap_every=500,        # burn a seq number every 500 outbound messages
+    dup_every=200,        # PossDup duplicate every 200 outbound messages
+    split_every=7,        # split every 7th write across two TCP segments
+    coalesce_every=5,     # glue every 5th write onto the next one
+)
+venue.start_server()
+time.sleep(0.5)
+
+# 2. Drive 4 clients at 200 orders/s combined for 10 seconds
+load = LoadGenerator(host="localhost", port=9002, num_clients=4, rate=200, duration=10)
+report = load.run(drain=5)
+
+# 3. Report
+for key, value in report.items():
+    print(f"{key:>20}: {value}")
+
+venue.stop()